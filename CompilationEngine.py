@@ -2,9 +2,10 @@
 
 
 from sys import exit
-from JackTokenizer import JackTokenizer
+import JackParser
+import SyntaxTree as Tree
 from VMWriter import VMWriter
-from SymbolTable import ST
+from SymbolTable import ST, Kind
 
 """
 * Static variables:
@@ -25,122 +26,112 @@ from SymbolTable import ST
     * of the current object are accessed as follow:
         * 'pointer 0' is set to 'argument 0'.
         * the i-th field of this object is mapped on 'this i'.
+* Array entries:
+    * 'pointer 1' is set to the base-address of the array, and
+        the k-th entry is mapped on 'that k'.
+    * the base-address last written to 'pointer 1' is remembered, so that
+        consecutive accesses to the same array with a constant index
+        do not reload it.
 """
 
-op = "+-*/&|=><"
-unaryOp = "-~"
-keywordConstant = {"true", "false", "null", "this"}
-
 
 class CompilationEngine:
 
-    def __init__(self, input_filename, output_filename):
-        """ Creates a new compilation engine with the given input and output.
-            The next routine called must be compileClass. """
+    def __init__(self, input_filename, output_filename, useCache=False):
+        """ Creates a new compilation engine with the given input and output,
+            parses the input and writes the code of its class.
+            With useCache, the parsed input is cached, see JackParser.parse. """
         self.className = None
         self.subroutineName = None
         self.subroutineKind = None
         self.classST = None
         self.subroutineST = None
+        self.thatBase = None  # (segment, index) of the variable whose value is in 'pointer 1', if known
 
         self.labelCount = 0
-        self.tokenizer = JackTokenizer(input_filename)
+        tree = JackParser.parse(input_filename, useCache)
 
         self.vmWriter = VMWriter(output_filename)
-        self.compileClass()
+        self.compileClass(tree)
         self.vmWriter.close()
 
     def incLabelCount(self):
         self.labelCount = self.labelCount + 1
 
-    def compileClass(self):
+    def resolve(self, node, name):
+        """ Returns the (segment, index, type) of the given variable, used by the given node. """
+        symbol = self.subroutineST.resolve(name)
+        assert symbol is not None, f'using unknown variable \"{name}\" at line {node.line}, column {node.column}'
+        return symbol
+
+    def writeLabel(self, label):
+        """ Writes a label; control may reach it from elsewhere, so 'pointer 1' is unknown after it. """
+        self.vmWriter.writeLabel(label)
+        self.thatBase = None
+
+    def writeSubroutineCall(self, name, n_args):
+        """ Writes a call to a subroutine of the program.
+            'pointer 1' is saved and restored by the call, but the callee may assign
+            to a static or a field, so a base-address read from one is dropped. """
+        self.vmWriter.writeCall(name, n_args)
+        if self.thatBase is not None and self.thatBase[0] in ('static', 'this'):
+            self.thatBase = None
+
+    def setThat(self, segment, index):
+        """ Points 'that' at the array held in the given variable, unless it already does. """
+        if self.thatBase != (segment, index):
+            self.vmWriter.writePush(segment, index)
+            self.vmWriter.writePop('pointer', 1)
+            self.thatBase = (segment, index)
+
+    @staticmethod
+    def constantIndex(expression):
+        """ Returns the index if the given array index is a lone integerConstant, otherwise None. """
+        if not expression.operations and isinstance(expression.term, Tree.IntegerConstant):
+            return expression.term.value
+        return None
+
+    @staticmethod
+    def usesThat(expression):
+        """ Whether the code of the given expression may change 'pointer 1'. """
+        return any(isinstance(node, Tree.ArrayRef) for node in expression.walk())
+
+    @staticmethod
+    def hasCalls(expression):
+        """ Whether the given expression calls a subroutine, i.e. may have side effects. """
+        return any(isinstance(node, Tree.SubroutineCall) for node in expression.walk())
+
+    def compileClass(self, node):
         """ Compiles a complete class. """
-        self.tokenizer.advance()  # steps over 'class'
-        self.className = self.tokenizer.currentToken()  # gets 'className'
-        self.tokenizer.advance()  # steps over 'className'
-        self.tokenizer.advance()  # steps over '{'
-
+        self.className = node.name
         self.classST = ST()  # builds class-level symbol-table
-        while self.tokenizer.currentToken() in ["field", "static"]:
-            self.compileClassVarDec()
+        for varDec in node.varDecs:
+            self.compileVarDec(varDec, self.classST)
+        self.subroutineST = ST(self.classST)  # reset for every subroutine
 
         #  compiles every subroutine in the class, and writes the appropriate code
-        while self.tokenizer.currentToken() in ["constructor", "method", "function"]:
-            self.compileSubroutineDec()
-
-        self.tokenizer.advance()  # steps over '}'
-
-    def compileClassVarDec(self):
-        """ Compiles a static variable declaration, or a field declaration. """
-        kind = self.tokenizer.currentToken()  # whatis kind of class variable
-        self.tokenizer.advance()  # steps over 'kind'
-        type = self.tokenizer.currentToken()  # whatis type of class variable
-        self.tokenizer.advance()  # steps over 'type'
-
-        while True:
-            name = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over 'name'
-            if kind == 'field':
-                self.classST.add(name, type, kind)
-            elif kind == 'static':
-                self.classST.add(name, type, kind)
-            else:
-                assert False
-            if self.tokenizer.currentToken() == ',':
-                self.tokenizer.advance()  # steps over ',', if it exists
-            else:
-                break
-        self.tokenizer.advance()  # steps over ";"
-
-    def compileSubroutineDec(self):
-        """ Compiles a complete method, function, or constructor. """
-        self.subroutineST = ST()  # get new symbol-table for this subroutine
-
-        if self.tokenizer.currentToken() == "method":
-            self.subroutineST.add('this', self.className, 'argument')
-
-        self.subroutineKind = self.tokenizer.currentToken()
-        self.tokenizer.advance()  # steps over subroutineKind ('constructor', 'method', 'function')
-
-        return_type = self.tokenizer.currentToken()
-        self.tokenizer.advance()  # steps over return-type
-
-        self.subroutineName = self.tokenizer.currentToken()
-        self.tokenizer.advance()  # steps over subroutineName
-
-        self.tokenizer.advance()  # steps over '('
-        self.compileParameterList()
-        self.tokenizer.advance()  # steps over ')'
-
-        self.compileSubroutineBody()  # including '{', '}'
+        for subroutineDec in node.subroutineDecs:
+            self.compileSubroutineDec(subroutineDec)
 
-        self.subroutineST = None  # by now we are done with the subroutineST
+    def compileVarDec(self, node, symbolTable):
+        """ Adds the variables of a declaration to the given symbol-table. """
+        for name in node.names:
+            symbolTable.add(name, node.type, Kind[node.kind.upper()])
 
-    def compileParameterList(self):
-        """ Compiles a possibly empty parameter list.
-            Does not handle the enclosing ().
-            Returns the number of parameters."""
-        count = 0
-        while self.tokenizer.currentToken() != ")":
-            type = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over 'type'
-            name = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over 'name'
-            self.subroutineST.add(name, type, 'argument')
-            count = count + 1
-            if self.tokenizer.currentToken() == ',':
-                self.tokenizer.advance()  # steps over ',', if it exists
-        return count
+    def compileSubroutineDec(self, node):
+        """ Compiles a complete method, function, or constructor. """
+        self.subroutineST.reset()  # clean symbol-table for this subroutine
 
-    def compileSubroutineBody(self):
-        """ Compiles a subroutine's body.
-            Handles the enclosing {}. """
-        self.tokenizer.advance()  # steps over '{'
+        if node.kind == "method":
+            self.subroutineST.add('this', self.className, Kind.ARGUMENT)
 
-        while self.tokenizer.currentToken() == "var":
-            self.compileVarDec()
+        self.subroutineKind = node.kind
+        self.subroutineName = node.name
+        for varDec in node.parameters + node.varDecs:
+            self.compileVarDec(varDec, self.subroutineST)
 
         self.vmWriter.writeFunction(self.className + '.' + self.subroutineName, self.subroutineST.n_locals())
+        self.thatBase = None
         if self.subroutineKind == 'constructor':
             self.vmWriter.writePush('constant', self.classST.n_fields())
             self.vmWriter.writeCall('Memory.alloc', 1)
@@ -149,300 +140,197 @@ class CompilationEngine:
             self.vmWriter.writePush('argument', 0)
             self.vmWriter.writePop('pointer', 0)
 
-        self.compileStatements()
-
-        self.tokenizer.advance()  # steps over '}'
-
-    def compileVarDec(self):
-        """ Compiles a var declaration. """
-        self.tokenizer.advance()  # steps over 'var'
-        type = self.tokenizer.currentToken()
-        self.tokenizer.advance()  # steps over 'type'
-
-        while self.tokenizer.currentToken() != ";":
-            name = self.tokenizer.currentToken()
-            self.tokenizer.advance()
-            self.subroutineST.add(name, type, 'local')
-            if self.tokenizer.currentToken() == ',':
-                self.tokenizer.advance()  # steps over ',', if it exists
-
-        self.tokenizer.advance()  # steps over ';'
-
-    def compileStatements(self):
-        """ Compiles a sequence of statements
-            Does not handle the enclosing {}. """
-        while True:
-            token = self.tokenizer.currentToken()
-            if token == "if":
-                self.compileIf()
-            elif token == "while":
-                self.compileWhile()
-            elif token == "let":
-                self.compileLet()
-            elif token == "do":
-                self.compileDo()
-            elif token == "return":
-                self.compileReturn()
+        self.compileStatements(node.statements)
+
+    def compileStatements(self, statements):
+        """ Compiles a sequence of statements. """
+        for statement in statements:
+            if isinstance(statement, Tree.IfStatement):
+                self.compileIf(statement)
+            elif isinstance(statement, Tree.WhileStatement):
+                self.compileWhile(statement)
+            elif isinstance(statement, Tree.LetStatement):
+                self.compileLet(statement)
+            elif isinstance(statement, Tree.DoStatement):
+                self.compileDo(statement)
+            elif isinstance(statement, Tree.ReturnStatement):
+                self.compileReturn(statement)
             else:
-                break
+                assert False
 
-    def compileIf(self):
+    def compileIf(self, node):
         """ Compiles an if statement, possibly with a trailing else clause. """
-        self.tokenizer.advance()  # steps over "if"
-        self.tokenizer.advance()  # steps over "("
-        self.compileExpression()
+        self.compileExpression(node.condition)
         self.vmWriter.writeArithmetic('~', unary=True)  # not
         l1 = 'ifLbl' + str(self.labelCount)
         self.incLabelCount()
         self.vmWriter.writeIf(l1)
-        self.tokenizer.advance()  # steps over ")"
 
-        self.tokenizer.advance()  # steps over "{"
-        self.compileStatements()
-        self.tokenizer.advance()  # steps over "}"
+        self.compileStatements(node.statements)
 
-        if self.tokenizer.currentToken() == "else":  # handling "else" clause, if exists
+        if node.elseStatements is not None:  # handling "else" clause, if exists
             l2 = 'ifLbl' + str(self.labelCount)
             self.incLabelCount()
             self.vmWriter.writeGoto(l2)
-            self.vmWriter.writeLabel(l1)
+            self.writeLabel(l1)
 
-            self.tokenizer.advance()  # steps over "else"
-            self.tokenizer.advance()  # steps over "{"
-            self.compileStatements()
-            self.tokenizer.advance()  # steps over "}"
+            self.compileStatements(node.elseStatements)
 
-            self.vmWriter.writeLabel(l2)
+            self.writeLabel(l2)
         else:
-            self.vmWriter.writeLabel(l1)
+            self.writeLabel(l1)
 
-    def compileWhile(self):
+    def compileWhile(self, node):
         """ Compiles a while statement. """
         l1 = "whileLbl" + str(self.labelCount)
         self.incLabelCount()
         l2 = "whileLbl" + str(self.labelCount)
         self.incLabelCount()
 
-        self.vmWriter.writeLabel(l1)
-        self.tokenizer.advance()  # steps over "while"
-        self.tokenizer.advance()  # steps over "("
-        self.compileExpression()
-        self.tokenizer.advance()  # steps over ")"
+        self.writeLabel(l1)
+        self.compileExpression(node.condition)
         self.vmWriter.writeArithmetic('~', unary=True)  # not
         self.vmWriter.writeIf(l2)
 
-        self.tokenizer.advance()  # steps over "{"
-        self.compileStatements()
+        self.compileStatements(node.statements)
         self.vmWriter.writeGoto(l1)
-        self.vmWriter.writeLabel(l2)
-        self.tokenizer.advance()  # steps over "}"
+        self.writeLabel(l2)
 
-    def compileLet(self):
+    def compileLet(self, node):
         """ Compiles a let statement. """
-        self.tokenizer.advance()  # steps over "let"
-        varName = self.tokenizer.currentToken()
-        if varName in self.subroutineST:
-            name, type, kind, index = self.subroutineST.get(varName)
-        elif varName in self.classST:
-            name, type, kind, index = self.classST.get(varName)
-        else:
-            assert False, f'using unknown variable \"{varName}\"'
-        self.tokenizer.advance()  # steps over varName
-
-        if self.tokenizer.currentToken() == '[':  # varName[expression] = .....
-            self.tokenizer.advance()  # steps over '['
-            self.compileExpression()
-            self.tokenizer.advance()  # steps over ']'
-            self.vmWriter.writePush(kind, index)
+        segment, index, type = self.resolve(node, node.name)
+
+        if node.index is None:  # varName = .....
+            self.compileExpression(node.value)
+
+            self.vmWriter.writePop(segment, index)
+            if self.thatBase == (segment, index):  # varName no longer holds what 'pointer 1' points at
+                self.thatBase = None
+            return
+
+        offset = self.constantIndex(node.index)
+        if offset is not None:  # varName[integerConstant] = .....
+            if not self.usesThat(node.value):  # 'pointer 1' survives the expression
+                self.setThat(segment, index)
+                self.compileExpression(node.value)
+            elif segment in ('local', 'argument') or not self.hasCalls(node.value):
+                # varName can not change while evaluating the expression
+                self.compileExpression(node.value)
+                self.setThat(segment, index)
+            else:
+                self.vmWriter.writePush(segment, index)
+                self.compileExpression(node.value)
+                self.vmWriter.writePop('temp', 0)
+                self.vmWriter.writePop('pointer', 1)
+                self.vmWriter.writePush('temp', 0)
+                self.thatBase = None
+            self.vmWriter.writePop('that', offset)
+        else:  # varName[expression] = .....
+            self.compileExpression(node.index)
+            self.vmWriter.writePush(segment, index)
             self.vmWriter.writeArithmetic('+')
-            assert self.tokenizer.currentToken() == '='  # just a healthy check
-            self.tokenizer.advance()  # steps over '='
-            self.compileExpression()
-            self.vmWriter.writePop('temp', 0)
-            self.vmWriter.writePop('pointer', 1)
-            self.vmWriter.writePush('temp', 0)
+            if not self.usesThat(node.value):  # 'pointer 1' survives the expression
+                self.vmWriter.writePop('pointer', 1)
+                self.thatBase = None
+                self.compileExpression(node.value)
+            else:
+                self.compileExpression(node.value)
+                self.vmWriter.writePop('temp', 0)
+                self.vmWriter.writePop('pointer', 1)
+                self.vmWriter.writePush('temp', 0)
+                self.thatBase = None
             self.vmWriter.writePop('that', 0)
-        elif self.tokenizer.currentToken() == '=':
-            self.tokenizer.advance()  # steps over '='
-
-            self.compileExpression()
 
-            self.vmWriter.writePop(kind, index)
-        else:
-            assert False
-        self.tokenizer.advance()  # steps over ';'
-
-    def compileDo(self):
+    def compileDo(self, node):
         """ Compiles a do statement. """
-        self.tokenizer.advance()  # steps over 'do'
-        currentToken = self.tokenizer.currentToken()
-        self.tokenizer.advance()  # steps over currentToken
-
-        if self.tokenizer.currentToken() == '.':  # varName.methodName(....) or className.functionName(....)
-            self.tokenizer.advance()  # steps over '.'
-            subroutineName = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over subroutineName
-            self.tokenizer.advance()  # steps over '('
-            if currentToken in self.classST or currentToken in self.subroutineST:
-                name, type, kind, index = self.subroutineST.get(currentToken) if currentToken in self.subroutineST \
-                    else self.classST.get(currentToken)
-                self.vmWriter.writePush(kind, index)
-                self.vmWriter.writeCall(type+'.'+subroutineName, self.compileExpressionList()+1)
-                # +1 for the implicit argument 'this'
-            else:
-                self.vmWriter.writeCall(currentToken+'.'+subroutineName, self.compileExpressionList())
-            self.tokenizer.advance()  # steps over ')'
-        elif self.tokenizer.currentToken() == '(':  # method call on the current object
-            self.vmWriter.writePush('pointer', 0)
-            self.tokenizer.advance()  # steps over '('
-            self.vmWriter.writeCall(self.className+'.'+currentToken, self.compileExpressionList()+1)
-            # +1 for the implicit argument 'this'
-            self.tokenizer.advance()  # steps over ')'
-        else:
-            assert False
-        assert self.tokenizer.currentToken() == ';'  # healthy check
-        self.tokenizer.advance()  # steps over ';'
+        self.compileSubroutineCall(node.call)
         self.vmWriter.writePop('temp', 0)
 
-    def compileReturn(self):
+    def compileReturn(self, node):
         """ Compiles a return statement. """
-        self.tokenizer.advance()  # steps over 'return'
-        if self.tokenizer.currentToken() == ";":  # returns void
-            self.tokenizer.advance()  # steps over ';'
+        if node.value is None:  # returns void
             self.vmWriter.writePush('constant', 0)  # void methods returns 0
         else:
-            self.compileExpression()
-            self.tokenizer.advance()  # steps over ';'
+            self.compileExpression(node.value)
         self.vmWriter.writeReturn()
 
-    def compileExpression(self):
+    def compileSubroutineCall(self, node):
+        """ Compiles subroutineName '('expressionList')', or
+            (className|varName)'.'subroutineName'('expressionList')' """
+        if node.receiver is None:  # method call on the current object
+            self.vmWriter.writePush('pointer', 0)
+            self.writeSubroutineCall(self.className + '.' + node.name, self.compileExpressionList(node.arguments) + 1)
+            # +1 is for the implicit argument 'this'
+            return
+
+        symbol = self.subroutineST.resolve(node.receiver)
+        if symbol is not None:  # varName.methodName(....)
+            segment, index, type = symbol
+            self.vmWriter.writePush(segment, index)
+            self.writeSubroutineCall(type + '.' + node.name, self.compileExpressionList(node.arguments) + 1)
+            # +1 is for the implicit argument 'this'
+        else:  # className.functionName(....)
+            self.writeSubroutineCall(node.receiver + '.' + node.name, self.compileExpressionList(node.arguments))
+
+    def compileExpression(self, node):
         """ Compiles an expression. """
-        self.compileTerm()
-        while self.tokenizer.currentToken() in op:
-            operator = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over operator
-            self.compileTerm()
+        self.compileTerm(node.term)
+        for operator, term in node.operations:
+            self.compileTerm(term)
             self.vmWriter.writeArithmetic(operator)
 
-    def compileTerm(self):
-        """ Compiles a term, if the current token is an identifier, the routine must distinguish
-            between a variable, an array entry, or a subroutine call.
-            A single look-ahead token, which may be one of '(', '[', or '.', suffices to distinguish
-            between the possibilities.
-            Any other token is not part of this term, and should not be advanced over. """
-
-        if self.tokenizer.tokenType() == 'integerConstant':  # case no 1; integerConstant
-            self.vmWriter.writePush('constant', self.tokenizer.currentToken())
-            self.tokenizer.advance()  # steps over integerConstant
-        elif self.tokenizer.tokenType() == 'stringConstant':  # case no 2; stringConstant
-            string = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over stringConstant
-            self.vmWriter.writePush('constant', len(string))
+    def compileTerm(self, node):
+        """ Compiles a term. """
+        if isinstance(node, Tree.IntegerConstant):
+            self.vmWriter.writePush('constant', node.value)
+        elif isinstance(node, Tree.StringConstant):
+            self.vmWriter.writePush('constant', len(node.value))
             self.vmWriter.writeCall('String.new', 1)
-            for s in string:
+            for s in node.value:
                 self.vmWriter.writePush('constant', ord(s))
                 self.vmWriter.writeCall('String.appendChar', 2)
-        elif self.tokenizer.currentToken() in keywordConstant:  # case no 3; keywordConstant
-            constant = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over constant
-            if constant == 'true':
+        elif isinstance(node, Tree.KeywordConstant):
+            if node.value == 'true':
                 self.vmWriter.writePush('constant', 0)
                 self.vmWriter.writeArithmetic('~', unary=True)  # not
-                pass
-            elif constant == 'false':
-                self.vmWriter.writePush('constant', 0)
-                pass
-            elif constant == 'null':
+            elif node.value in ('false', 'null'):
                 self.vmWriter.writePush('constant', 0)
-                pass
-            elif constant == 'this':
+            elif node.value == 'this':
                 self.vmWriter.writePush('pointer', 0)
-                pass
             else:
                 assert False, 'disaster'
-        elif self.tokenizer.tokenType() == "identifier":  # case no 4, 5, 6;
-            # varName
-            # varName '['expression']'
-            # subroutineCall:
-            #     subroutineName '('expressionList')'
-            #     (className|varName)'.'subroutineName'('expressionList')'
-            currentToken = self.tokenizer.currentToken()
-            if currentToken in self.subroutineST or currentToken in self.classST:
-
-                name, type, kind, index = self.subroutineST.get(currentToken) \
-                    if currentToken in self.subroutineST else self.classST.get(currentToken)
-
-                if self.tokenizer.nextToken() == '[':  # varName'['expression']'
-                    self.tokenizer.advance()  # steps over currentToken, which is a variable
-                    self.tokenizer.advance()  # steps over '['
-                    self.compileExpression()  # compute the offset (i.e. the result of evaluating '['expression']')
-                    self.tokenizer.advance()  # steps over ']'
-                    self.vmWriter.writePush(kind, index)  # push varName, the base-address
-                    self.vmWriter.writeArithmetic('+')  # compute base-address + offset
-                    self.vmWriter.writePop('pointer', 1)
-                    self.vmWriter.writePush('that', 0)  # the result of varName[expression] in topmost of stack
-                    pass
-
-                elif self.tokenizer.nextToken() == '.':  # varName'.'subroutineName'('expressionList')'
-                    self.vmWriter.writePush(kind, index)
-                    self.tokenizer.advance()  # steps over currentToken
-                    self.tokenizer.advance()  # steps over '.'
-                    subroutineName = self.tokenizer.currentToken()
-                    self.tokenizer.advance()  # steps over subroutineName
-                    self.tokenizer.advance()  # steps over '('
-                    self.vmWriter.writeCall(type+'.'+subroutineName, self.compileExpressionList() + 1)  # +1 is for
-                    # the implicit argument
-                    self.tokenizer.advance()  # steps over ')'
-                    pass
-                else:  # varName
-                    self.vmWriter.writePush(kind, index)
-                    self.tokenizer.advance()  # steps over varName
-                    pass
+        elif isinstance(node, Tree.VarRef):
+            segment, index, type = self.resolve(node, node.name)
+            self.vmWriter.writePush(segment, index)
+        elif isinstance(node, Tree.ArrayRef):
+            segment, index, type = self.resolve(node, node.name)
+            offset = self.constantIndex(node.index)
+            if offset is not None:  # the offset is folded into the index of 'that'
+                self.setThat(segment, index)
+                self.vmWriter.writePush('that', offset)
             else:
-                if self.tokenizer.nextToken() == '(':  # subroutineName '(' expressionList')'
-                    # the subroutine in this case is a method
-                    self.tokenizer.advance()  # steps over currentToken
-                    self.tokenizer.advance()  # steps over '('
-                    self.vmWriter.writePush('pointer', 0)
-                    self.vmWriter.writeCall(self.className + '.' + currentToken, self.compileExpressionList() + 1)
-                    # +1 is for the implicit argument
-                    self.tokenizer.advance()  # steps over ')'
-                elif self.tokenizer.nextToken() == '.':  # className.subroutineName'('expressionList')'
-                    # the subroutine in this case is a function
-                    self.tokenizer.advance()  # steps over currentToken
-                    self.tokenizer.advance()  # steps over '.'
-                    subroutineName = self.tokenizer.currentToken()
-                    self.tokenizer.advance()  # steps over subroutineName
-                    self.tokenizer.advance()  # steps over '('
-                    self.vmWriter.writeCall(currentToken+'.'+subroutineName, self.compileExpressionList())
-                    self.tokenizer.advance()  # steps over ')'
-                else:  # disaster
-                    assert False
-
-        elif self.tokenizer.currentToken() == "(":  # case no 7; '('expression')'
-            self.tokenizer.advance()  # steps over '('
-            self.compileExpression()
-            self.tokenizer.advance()  # steps over ')'
-        elif self.tokenizer.currentToken() in unaryOp:  # case no 8; unaryOp term
-            command = self.tokenizer.currentToken()
-            self.tokenizer.advance()  # steps over unaryOp
-            self.compileTerm()
-            self.vmWriter.writeArithmetic(command, unary=True)
+                self.compileExpression(node.index)  # compute the offset
+                self.vmWriter.writePush(segment, index)  # push varName, the base-address
+                self.vmWriter.writeArithmetic('+')  # compute base-address + offset
+                self.vmWriter.writePop('pointer', 1)
+                self.thatBase = None
+                self.vmWriter.writePush('that', 0)  # the result of varName[expression] in topmost of stack
+        elif isinstance(node, Tree.SubroutineCall):
+            self.compileSubroutineCall(node)
+        elif isinstance(node, Tree.Expression):  # '('expression')'
+            self.compileExpression(node)
+        elif isinstance(node, Tree.UnaryOp):
+            self.compileTerm(node.term)
+            self.vmWriter.writeArithmetic(node.op, unary=True)
         else:
-            #  disaster
-            #  none of the above works
             assert False, f'huge disaster, WTF!@%@^!%$!^%$'
 
-    def compileExpressionList(self):
-        """ Compiles (a possibly empty) comma-separated list of expressions.
+    def compileExpressionList(self, expressions):
+        """ Compiles a list of expressions.
             Returns the number of expressions"""
-        count = 0
-        while self.tokenizer.currentToken() != ")":
-            self.compileExpression()
-            count = count + 1
-            if self.tokenizer.currentToken() == ",":
-                self.tokenizer.advance()  # steps over ',', if exists
-        return count
+        for expression in expressions:
+            self.compileExpression(expression)
+        return len(expressions)
 
 
 def main():
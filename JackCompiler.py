@@ -7,16 +7,21 @@ import os
 
 
 def main():
-    if len(argv) != 2:
-        print("Usage: JackCompiler [.jack file_name] | [directory_name]")
+    args = argv[1:]
+    useCache = "--cache" in args  # caches parsed files, see JackParser.parse
+    if useCache:
+        args.remove("--cache")
+    if len(args) != 1:
+        print("Usage: JackCompiler [--cache] [.jack file_name] | [directory_name]")
         return 1
-    if os.path.isfile(argv[1]) and argv[1].endswith(".jack"):
-        CompilationEngine(argv[1], argv[1].replace(".jack", ".vm"))
-    elif os.path.isdir(argv[1]):
-        files = [file for file in os.listdir(argv[1]) if file.endswith(".jack")]
-        os.chdir(argv[1])
+    path = args[0]
+    if os.path.isfile(path) and path.endswith(".jack"):
+        CompilationEngine(path, path.replace(".jack", ".vm"), useCache)
+    elif os.path.isdir(path):
+        files = [file for file in os.listdir(path) if file.endswith(".jack")]
+        os.chdir(path)
         files = map(os.path.abspath, files)
-        [CompilationEngine(file, file.replace(".jack", ".vm")) for file in files]
+        [CompilationEngine(file, file.replace(".jack", ".vm"), useCache) for file in files]
     else:
         print("Provide a valid input..")
         return 1
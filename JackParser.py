@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+
+from sys import exit
+from sys import argv
+from sys import intern
+from JackTokenizer import JackTokenizer
+import SyntaxTree as Tree
+import glob
+import hashlib
+import os
+import pickle
+
+"""
+* Parses a .jack class into a SyntaxTree, without generating any code.
+
+* When asked to (see JackCompiler.py --cache), parsed trees are cached
+    in the cache directory of the user, keyed by the absolute path and a hash
+    of the source; a rerun on an unchanged file loads the pickled tree instead
+    of tokenizing and parsing it again.
+* The cache is never read from the directory of the sources: loading a pickle
+    may run code, so only trees written by the same user are trusted.
+    Anything that fails to load, or is not a tree, is parsed again.
+* Bump CACHE_VERSION whenever the SyntaxTree nodes or the tokenizer change.
+"""
+
+CACHE_VERSION = 3
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                         "jack-compiler")
+
+op = "+-*/&|=><"
+unaryOp = "-~"
+keywordConstant = {"true", "false", "null", "this"}
+
+
+class JackParser:
+    def __init__(self, filename):
+        """ Tokenizes and parses the given .jack file; the result is in self.tree """
+        self.tokenizer = JackTokenizer(filename)
+        self.tree = self.parseClass()
+
+    def identifier(self):
+        """ Returns the current token, interned, and steps over it. """
+        name = intern(self.tokenizer.currentToken())
+        self.tokenizer.advance()
+        return name
+
+    def parseClass(self):
+        """ Parses a complete class. """
+        position = self.tokenizer.position()
+        self.tokenizer.advance()  # steps over 'class'
+        className = self.identifier()
+        self.tokenizer.advance()  # steps over '{'
+
+        varDecs = []
+        while self.tokenizer.currentToken() in ["field", "static"]:
+            varDecs.append(self.parseClassVarDec())
+
+        subroutineDecs = []
+        while self.tokenizer.currentToken() in ["constructor", "method", "function"]:
+            subroutineDecs.append(self.parseSubroutineDec())
+
+        self.tokenizer.advance()  # steps over '}'
+        return Tree.Class(position, className, varDecs, subroutineDecs)
+
+    def parseClassVarDec(self):
+        """ Parses a static variable declaration, or a field declaration. """
+        position = self.tokenizer.position()
+        kind = self.tokenizer.currentToken()
+        assert kind in ['field', 'static']
+        self.tokenizer.advance()  # steps over 'kind'
+        type = self.identifier()
+
+        names = []
+        while True:
+            names.append(self.identifier())
+            if self.tokenizer.currentToken() == ',':
+                self.tokenizer.advance()  # steps over ',', if it exists
+            else:
+                break
+        self.tokenizer.advance()  # steps over ";"
+        return Tree.VarDec(position, kind, type, names)
+
+    def parseSubroutineDec(self):
+        """ Parses a complete method, function, or constructor. """
+        position = self.tokenizer.position()
+        kind = self.tokenizer.currentToken()
+        self.tokenizer.advance()  # steps over subroutineKind ('constructor', 'method', 'function')
+        returnType = self.identifier()
+        name = self.identifier()
+
+        self.tokenizer.advance()  # steps over '('
+        parameters = self.parseParameterList()
+        self.tokenizer.advance()  # steps over ')'
+
+        self.tokenizer.advance()  # steps over '{'
+        varDecs = []
+        while self.tokenizer.currentToken() == "var":
+            varDecs.append(self.parseVarDec())
+        statements = self.parseStatements()
+        self.tokenizer.advance()  # steps over '}'
+        return Tree.SubroutineDec(position, kind, returnType, name, parameters, varDecs, statements)
+
+    def parseParameterList(self):
+        """ Parses a possibly empty parameter list.
+            Does not handle the enclosing ()."""
+        parameters = []
+        while self.tokenizer.currentToken() != ")":
+            position = self.tokenizer.position()
+            type = self.identifier()
+            name = self.identifier()
+            parameters.append(Tree.VarDec(position, 'argument', type, [name]))
+            if self.tokenizer.currentToken() == ',':
+                self.tokenizer.advance()  # steps over ',', if it exists
+        return parameters
+
+    def parseVarDec(self):
+        """ Parses a var declaration. """
+        position = self.tokenizer.position()
+        self.tokenizer.advance()  # steps over 'var'
+        type = self.identifier()
+
+        names = []
+        while self.tokenizer.currentToken() != ";":
+            names.append(self.identifier())
+            if self.tokenizer.currentToken() == ',':
+                self.tokenizer.advance()  # steps over ',', if it exists
+
+        self.tokenizer.advance()  # steps over ';'
+        return Tree.VarDec(position, 'local', type, names)
+
+    def parseStatements(self):
+        """ Parses a sequence of statements
+            Does not handle the enclosing {}. """
+        statements = []
+        while True:
+            token = self.tokenizer.currentToken()
+            if token == "if":
+                statements.append(self.parseIf())
+            elif token == "while":
+                statements.append(self.parseWhile())
+            elif token == "let":
+                statements.append(self.parseLet())
+            elif token == "do":
+                statements.append(self.parseDo())
+            elif token == "return":
+                statements.append(self.parseReturn())
+            else:
+                return statements
+
+    def parseIf(self):
+        """ Parses an if statement, possibly with a trailing else clause. """
+        position = self.tokenizer.position()
+        self.tokenizer.advance()  # steps over "if"
+        self.tokenizer.advance()  # steps over "("
+        condition = self.parseExpression()
+        self.tokenizer.advance()  # steps over ")"
+
+        self.tokenizer.advance()  # steps over "{"
+        statements = self.parseStatements()
+        self.tokenizer.advance()  # steps over "}"
+
+        elseStatements = None
+        if self.tokenizer.currentToken() == "else":  # handling "else" clause, if exists
+            self.tokenizer.advance()  # steps over "else"
+            self.tokenizer.advance()  # steps over "{"
+            elseStatements = self.parseStatements()
+            self.tokenizer.advance()  # steps over "}"
+        return Tree.IfStatement(position, condition, statements, elseStatements)
+
+    def parseWhile(self):
+        """ Parses a while statement. """
+        position = self.tokenizer.position()
+        self.tokenizer.advance()  # steps over "while"
+        self.tokenizer.advance()  # steps over "("
+        condition = self.parseExpression()
+        self.tokenizer.advance()  # steps over ")"
+
+        self.tokenizer.advance()  # steps over "{"
+        statements = self.parseStatements()
+        self.tokenizer.advance()  # steps over "}"
+        return Tree.WhileStatement(position, condition, statements)
+
+    def parseLet(self):
+        """ Parses a let statement. """
+        position = self.tokenizer.position()
+        self.tokenizer.advance()  # steps over "let"
+        varName = self.identifier()
+
+        index = None
+        if self.tokenizer.currentToken() == '[':  # varName[expression] = .....
+            self.tokenizer.advance()  # steps over '['
+            index = self.parseExpression()
+            self.tokenizer.advance()  # steps over ']'
+        assert self.tokenizer.currentToken() == '='  # just a healthy check
+        self.tokenizer.advance()  # steps over '='
+        value = self.parseExpression()
+        self.tokenizer.advance()  # steps over ';'
+        return Tree.LetStatement(position, varName, index, value)
+
+    def parseDo(self):
+        """ Parses a do statement. """
+        position = self.tokenizer.position()
+        self.tokenizer.advance()  # steps over 'do'
+        call = self.parseSubroutineCall()
+        assert self.tokenizer.currentToken() == ';'  # healthy check
+        self.tokenizer.advance()  # steps over ';'
+        return Tree.DoStatement(position, call)
+
+    def parseReturn(self):
+        """ Parses a return statement. """
+        position = self.tokenizer.position()
+        self.tokenizer.advance()  # steps over 'return'
+        value = None
+        if self.tokenizer.currentToken() != ";":  # does not return void
+            value = self.parseExpression()
+        self.tokenizer.advance()  # steps over ';'
+        return Tree.ReturnStatement(position, value)
+
+    def parseSubroutineCall(self):
+        """ Parses subroutineName '('expressionList')', or
+            (className|varName)'.'subroutineName'('expressionList')' """
+        position = self.tokenizer.position()
+        receiver = None
+        name = self.identifier()
+        if self.tokenizer.currentToken() == '.':
+            self.tokenizer.advance()  # steps over '.'
+            receiver, name = name, self.identifier()
+        assert self.tokenizer.currentToken() == '('
+        self.tokenizer.advance()  # steps over '('
+        arguments = self.parseExpressionList()
+        self.tokenizer.advance()  # steps over ')'
+        return Tree.SubroutineCall(position, receiver, name, arguments)
+
+    def parseExpression(self):
+        """ Parses an expression. """
+        position = self.tokenizer.position()
+        term = self.parseTerm()
+        operations = []
+        while self.tokenizer.currentToken() in op:
+            operator = self.tokenizer.currentToken()
+            self.tokenizer.advance()  # steps over operator
+            operations.append((operator, self.parseTerm()))
+        return Tree.Expression(position, term, operations)
+
+    def parseTerm(self):
+        """ Parses a term, if the current token is an identifier, the routine must distinguish
+            between a variable, an array entry, or a subroutine call.
+            A single look-ahead token, which may be one of '(', '[', or '.', suffices to distinguish
+            between the possibilities.
+            Any other token is not part of this term, and should not be advanced over. """
+        position = self.tokenizer.position()
+        if self.tokenizer.tokenType() == 'integerConstant':
+            value = int(self.tokenizer.currentToken())
+            self.tokenizer.advance()  # steps over integerConstant
+            return Tree.IntegerConstant(position, value)
+        elif self.tokenizer.tokenType() == 'stringConstant':
+            value = self.tokenizer.currentToken()
+            self.tokenizer.advance()  # steps over stringConstant
+            return Tree.StringConstant(position, value)
+        elif self.tokenizer.currentToken() in keywordConstant:
+            value = self.tokenizer.currentToken()
+            self.tokenizer.advance()  # steps over constant
+            return Tree.KeywordConstant(position, value)
+        elif self.tokenizer.tokenType() == "identifier":
+            if self.tokenizer.nextToken() in ['(', '.']:  # subroutineCall
+                return self.parseSubroutineCall()
+            varName = self.identifier()
+            if self.tokenizer.currentToken() == '[':  # varName'['expression']'
+                self.tokenizer.advance()  # steps over '['
+                index = self.parseExpression()
+                self.tokenizer.advance()  # steps over ']'
+                return Tree.ArrayRef(position, varName, index)
+            return Tree.VarRef(position, varName)
+        elif self.tokenizer.currentToken() == "(":  # '('expression')'
+            self.tokenizer.advance()  # steps over '('
+            expression = self.parseExpression()
+            self.tokenizer.advance()  # steps over ')'
+            return expression
+        elif self.tokenizer.currentToken() in unaryOp:  # unaryOp term
+            command = self.tokenizer.currentToken()
+            self.tokenizer.advance()  # steps over unaryOp
+            return Tree.UnaryOp(position, command, self.parseTerm())
+        else:
+            line, column = position
+            assert False, f'unexpected token \"{self.tokenizer.currentToken()}\" at line {line}, column {column}'
+
+    def parseExpressionList(self):
+        """ Parses (a possibly empty) comma-separated list of expressions. """
+        expressions = []
+        while self.tokenizer.currentToken() != ")":
+            expressions.append(self.parseExpression())
+            if self.tokenizer.currentToken() == ",":
+                self.tokenizer.advance()  # steps over ',', if exists
+        return expressions
+
+
+def parse(filename, useCache=False):
+    """ Returns the syntax tree of the given .jack file.
+        With useCache, the tree is loaded from the cache if the file is unchanged. """
+    if not useCache:
+        return JackParser(filename).tree
+
+    with open(filename, 'rb') as inFileHandle:
+        digest = hashlib.sha1(inFileHandle.read()).hexdigest()
+    pathDigest = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()
+    stem = os.path.join(CACHE_DIR, pathDigest)
+    cacheFile = f"{stem}.{digest}.v{CACHE_VERSION}.ast"
+
+    try:
+        with open(cacheFile, 'rb') as cacheHandle:
+            tree = pickle.load(cacheHandle)
+        if isinstance(tree, Tree.Class):
+            return tree
+    except Exception:
+        pass  # a broken cache file is parsed again, and overwritten
+
+    tree = JackParser(filename).tree
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        for staleFile in glob.glob(glob.escape(stem) + ".*.ast"):  # trees of older versions of the file
+            os.remove(staleFile)
+        with open(cacheFile, 'wb') as cacheHandle:
+            pickle.dump(tree, cacheHandle, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # the cache is only an optimization
+    return tree
+
+
+def main():
+    if len(argv) != 2:
+        print("Usage: ./JackParser.py [.jack file]")
+        return 1
+    print(parse(argv[1]))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -2,8 +2,87 @@
 
 from sys import exit
 from sys import argv
+import argparse
+import functools
+import json
+import multiprocessing
 import os
 import re
+import struct
+import time
+
+
+"""
+* Token dumps:
+    * './JackTokenizer.py [options] path...' writes the tokens of every given
+        .jack file, or of every .jack file in a given directory, next to it.
+    * formats:
+        * xml:   '<kind> value </kind>' lines inside '<tokens>', in a .token file.
+        * jsonl: one '{"kind": ..., "value": ..., "line": ..., "column": ...}' object
+            per line, in a .token.jsonl file.
+        * bin:   the header b'JTOK' and a version byte (2), then for every token a
+            big-endian (kind code, line, column, value length) header of
+            1 + 4 + 4 + 4 bytes, followed by the utf-8 value, in a .token.bin file.
+            The kind code is the index of the kind in TOKEN_KINDS.
+            Lines, columns and value lengths must be below 2**32; a token that
+            does not fit stops the dump with the file and line it is at.
+    * tokens are encoded and written in chunks, and files are tokenized in parallel.
+"""
+
+keywords = {'class', 'constructor', 'function', 'method', 'field', 'static', 'var', 'int', 'char', 'boolean',
+            'void',
+            'true', 'false', 'null', 'this', 'let', 'do', 'if', 'else', 'while', 'return'}
+tokens_patterns = [
+    ("stringConstant", r'"[^"]*"'),
+    ("identifier", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),
+    ("integerConstant", r"\b\d+\b"),
+    ("symbol", r"[][(){}.,;+*/&,<>=~|-]"),
+]
+tok_regex = re.compile('|'.join('(?P<%s>%s)' % pair for pair in tokens_patterns))
+
+TOKEN_KINDS = ("keyword", "symbol", "identifier", "integerConstant", "stringConstant")
+FORMATS = {"xml": ".token", "jsonl": ".token.jsonl", "bin": ".token.bin"}
+BINARY_MAGIC = b"JTOK\x02"
+BINARY_HEADER = struct.Struct(">BIII")  # kind code, line, column, length of the value in bytes
+BINARY_LIMIT = 2 ** 32
+CHUNK_SIZE = 4096  # tokens encoded per write
+
+
+def tokenize(filename):
+    """ Yields the (kind, value, line, column) of every token in the given .jack file, as it is read.
+        Lines and columns start at 1. """
+    with open(filename) as inFileHandle:
+        isComment = False
+        for lineNumber, line in enumerate(inFileHandle, 1):
+            line = line.rstrip()
+            # Handling comments; they are blanked out, so that the columns of the tokens do not move
+            if isComment and "*/" in line:
+                end = line.find("*/")+2
+                line = " " * end + line[end:]
+                isComment = False
+            if "//" in line:
+                line = line[:line.find("//")]
+            if "/*" in line and "*/" in line:
+                start, end = line.find("/*"), line.find("*/")+2
+                line = line[:start] + " " * (end - start) + line[end:]
+            if "/*" in line and "*/" not in line:
+                isComment = True
+            if isComment:
+                continue
+            if line.strip() == '':
+                continue
+            # End of handling comments
+            for mo in tok_regex.finditer(line):
+                kind = mo.lastgroup
+                value = mo.group()
+                column = mo.start() + 1
+                if kind == "identifier" and value in keywords:
+                    yield "keyword", value, lineNumber, column
+                elif kind == "stringConstant":
+                    value = value[1:-1]
+                    yield kind, value, lineNumber, column
+                else:
+                    yield kind, value, lineNumber, column
 
 
 class JackTokenizer:
@@ -14,46 +93,7 @@ class JackTokenizer:
         pass
 
     def process(self):
-        keywords = {'class', 'constructor', 'function', 'method', 'field', 'static', 'var', 'int', 'char', 'boolean',
-                    'void',
-                    'true', 'false', 'null', 'this', 'let', 'do', 'if', 'else', 'while', 'return'}
-        tokens_patterns = [
-            ("stringConstant", r'"([^"]|.)*"'),
-            ("identifier", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),
-            ("integerConstant", r"\b\d+\b"),
-            ("symbol", r"[][(){}.,;+*/&,<>=~|-]"),
-        ]
-        tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in tokens_patterns)
-
-        with open(self.filename) as inFileHandle:
-            isComment = False
-            for line in inFileHandle:
-                line = line.strip()
-                # Handling comments
-                if isComment and "*/" in line:
-                    line = line[line.find("*/")+2:]
-                    isComment = False
-                if "//" in line:
-                    line = line[:line.find("//")]
-                if "/*" in line and "*/" in line:
-                    line = line[:line.find("/*")] + line[line.find("*/")+2:]
-                if "/*" in line and "*/" not in line:
-                    isComment = True
-                if isComment:
-                    continue
-                if line == '':
-                    continue
-                # End of handling comments
-                for mo in re.finditer(tok_regex, line):
-                    kind = mo.lastgroup
-                    value = mo.group()
-                    if kind == "identifier" and value in keywords:
-                        yield "keyword", value
-                    elif kind == "stringConstant":
-                        value = value[1:-1]
-                        yield kind, value
-                    else:
-                        yield kind, value
+        return tokenize(self.filename)
 
     def advance(self):
         assert self.hasMoreTokens()
@@ -75,22 +115,102 @@ class JackTokenizer:
         assert len(self.tokens) >= 1
         return self.tokens[0][0]
 
+    def position(self):
+        """ Returns the (line, column) of the current token. """
+        assert len(self.tokens) >= 1
+        return self.tokens[0][2:4]
+
     def hasMoreTokens(self):
         return len(self.tokens) > 0
 
 
+def encodeXml(kind, value, line, column):
+    return f"<{kind}> {value} </{kind}>\n"
+
+
+def encodeJson(kind, value, line, column):
+    return f'{{"kind": "{kind}", "value": {json.dumps(value)}, "line": {line}, "column": {column}}}\n'
+
+
+def encodeBinary(kind, value, line, column):
+    value = value.encode()
+    if max(line, column, len(value)) >= BINARY_LIMIT:
+        raise ValueError(f"line {line}: the {kind} does not fit the bin format")
+    return BINARY_HEADER.pack(TOKEN_KINDS.index(kind), line, column, len(value)) + value
+
+
+def dumpTokens(filename, format="xml"):
+    """ Writes the tokens of the given .jack file in the given format.
+        Returns the filename, the number of tokens of every kind, and the seconds it took. """
+    encode, header, footer, joiner = {
+        "xml": (encodeXml, "<tokens>\n", "</tokens>\n", ""),
+        "jsonl": (encodeJson, "", "", ""),
+        "bin": (encodeBinary, BINARY_MAGIC, b"", b""),
+    }[format]
+    counts = dict.fromkeys(TOKEN_KINDS, 0)
+    start = time.perf_counter()
+
+    output_filename = filename[:-len(".jack")] + FORMATS[format]
+    with open(output_filename, "wb" if format == "bin" else "w") as outFileHandle:
+        outFileHandle.write(header)
+        chunk = []
+        for kind, value, line, column in tokenize(filename):
+            counts[kind] += 1
+            try:
+                chunk.append(encode(kind, value, line, column))
+            except ValueError as error:
+                raise ValueError(f"{filename}: {error}") from None
+            if len(chunk) == CHUNK_SIZE:
+                outFileHandle.write(joiner.join(chunk))
+                chunk.clear()
+        outFileHandle.write(joiner.join(chunk))
+        outFileHandle.write(footer)
+    return filename, counts, time.perf_counter() - start
+
+
 def main():
-    if len(argv) != 2:
-        print("Usage: ./JackTokenizer.py [.jack file]")
+    parser = argparse.ArgumentParser(prog="JackTokenizer.py",
+                                     description="Writes the tokens of .jack files next to them.")
+    parser.add_argument("paths", nargs="+", metavar="path", help=".jack file, or directory of .jack files")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="xml", help="token file format (default: xml)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="files tokenized in parallel (default: number of CPUs)")
+    parser.add_argument("-s", "--stats", action="store_true",
+                        help="report tokens per second and the number of tokens of every kind, per file")
+    args = parser.parse_args(argv[1:])
+
+    files = dict()  # real path -> path as given; a file named twice is written once
+    for path in args.paths:
+        if os.path.isfile(path) and path.endswith(".jack"):
+            files.setdefault(os.path.realpath(path), path)
+        elif os.path.isdir(path):
+            for file in sorted(os.listdir(path)):
+                if file.endswith(".jack"):
+                    file = os.path.join(path, file)
+                    files.setdefault(os.path.realpath(file), file)
+        else:
+            print(f"{path} is not a valid file")
+            return 1
+    files = list(files.values())
+
+    dump = functools.partial(dumpTokens, format=args.format)
+    jobs = min(max(args.jobs, 1), len(files))
+    try:
+        if jobs > 1:
+            with multiprocessing.Pool(jobs) as pool:
+                results = list(pool.imap(dump, files))
+        else:
+            results = list(map(dump, files))
+    except ValueError as error:
+        print(error)
         return 1
-    if not os.path.isfile(argv[1]) and not argv[1].endswith(".jack"):
-        print(f"{argv[1]} is not a valid file")
-
-    with open(argv[1].replace(".jack", ".token"), 'w') as outFileHandle:
-        outFileHandle.write("<tokens>\n")
-        for kind, value in JackTokenizer(argv[1]).tokens:
-            outFileHandle.write(f"<{kind}> {value} </{kind}>\n")
-        outFileHandle.write("</tokens>\n")
+
+    for filename, counts, seconds in results:
+        if args.stats:
+            n_tokens = sum(counts.values())
+            rate = n_tokens / seconds if seconds else 0
+            kinds = ", ".join(f"{kind} {counts[kind]}" for kind in TOKEN_KINDS)
+            print(f"{filename}: {n_tokens} tokens in {seconds * 1000:.2f} ms ({rate:,.0f} tokens/s); {kinds}")
     return 0
 
 
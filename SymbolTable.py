@@ -3,6 +3,7 @@
 
 from sys import exit
 from collections import namedtuple
+from enum import IntEnum
 
 """  
 * Variable properties:
@@ -23,20 +24,42 @@ from collections import namedtuple
 * Every time the compiler detects a variable in some statement or expression, 
     it looks up the variable in the subroutine-level symbol table, if not found,
     it looks it up in the class-level symbol table.
+    The subroutine-level table holds a copy of the class-level entries, so this
+    is a single lookup, and it is reset rather than rebuilt for every subroutine.
     
 """
 
-# variable properties
-VP = namedtuple("VP", ["name", "type", "kind", "index"])
+# variable kinds, and the virtual memory segment each of them is mapped on
+class Kind(IntEnum):
+    STATIC = 0
+    FIELD = 1
+    ARGUMENT = 2
+    LOCAL = 3
+
+
+SEGMENTS = ('static', 'this', 'argument', 'local')
+
+# what a variable resolves to; everything needed to push or pop it
+Symbol = namedtuple("Symbol", ["segment", "index", "type"])
 
 
 class ST:
-    def __init__(self):
+    def __init__(self, parent=None):
+        """ Creates an empty symbol-table, nested in the given one (if any). """
+        self.parent = parent
         self.entries = dict()
-        self.fieldIndex = 0
-        self.staticIndex = 0
-        self.argumentIndex = 0
-        self.localIndex = 0
+        self.counts = [0] * len(Kind)
+        self.reset()
+
+    def reset(self):
+        """ Empties the table, so it can be reused for the next subroutine.
+            The variables of the parent table are copied in, so a single
+            lookup resolves a name, and a variable declared here shadows them. """
+        self.entries.clear()
+        if self.parent is not None:
+            self.entries.update(self.parent.entries)
+        for kind in Kind:
+            self.counts[kind] = 0
 
     def __contains__(self, item):
         return item in self.entries
@@ -45,35 +68,28 @@ class ST:
         return len(self.entries)
 
     def n_fields(self):
-        return self.fieldIndex
+        return self.counts[Kind.FIELD]
 
     def n_statics(self):
-        return self.staticIndex
+        return self.counts[Kind.STATIC]
 
     def n_arguments(self):
-        return self.argumentIndex
+        return self.counts[Kind.ARGUMENT]
 
     def n_locals(self):
-        return self.localIndex
+        return self.counts[Kind.LOCAL]
 
     def get(self, variable):
         return self.entries[variable]
 
+    def resolve(self, variable):
+        """ Returns the Symbol of the given variable, or None if it is not declared. """
+        return self.entries.get(variable)
+
     def add(self, name, type, kind):
-        if kind == 'field':
-            self.entries[name] = VP(name=name, type=type, kind='this', index=self.fieldIndex)
-            self.fieldIndex = self.fieldIndex + 1
-        elif kind == 'static':
-            self.entries[name] = VP(name=name, type=type, kind=kind, index=self.staticIndex)
-            self.staticIndex = self.staticIndex + 1
-        elif kind == 'argument':
-            self.entries[name] = VP(name=name, type=type, kind=kind, index=self.argumentIndex)
-            self.argumentIndex = self.argumentIndex + 1
-        elif kind == 'local':
-            self.entries[name] = VP(name=name, type=type, kind=kind, index=self.localIndex)
-            self.localIndex = self.localIndex + 1
-        else:
-            assert False
+        index = self.counts[kind]
+        self.entries[name] = Symbol(segment=SEGMENTS[kind], index=index, type=type)
+        self.counts[kind] = index + 1
 
 
 def main():
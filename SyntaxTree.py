@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+from sys import exit
+
+"""
+* The syntax tree of a .jack class, as built by the JackParser and
+    walked by the CompilationEngine.
+
+* Every node keeps the line and the column of the .jack file it starts at.
+* Nodes use __slots__ and identifiers are interned, so a tree stays small
+    and can be pickled as is.
+
+* Expressions are not re-ordered by precedence; Jack evaluates
+    'term (op term)*' from left to right, and so does the tree.
+"""
+
+
+class Node:
+    __slots__ = ('line', 'column')
+
+    def __init__(self, position):
+        self.line, self.column = position
+
+    def children(self):
+        """ Yields the nodes directly below this one. """
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    if isinstance(item, Node):
+                        yield item
+
+    def walk(self):
+        """ Yields this node and every node below it, parents first. """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(list(node.children())))
+
+    def __repr__(self):
+        fields = ', '.join(f'{slot}={getattr(self, slot)!r}' for slot in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+# program structure
+
+class Class(Node):
+    __slots__ = ('name', 'varDecs', 'subroutineDecs')
+
+    def __init__(self, position, name, varDecs, subroutineDecs):
+        super().__init__(position)
+        self.name = name
+        self.varDecs = varDecs  # [VarDec] of kind 'field' or 'static'
+        self.subroutineDecs = subroutineDecs
+
+
+class VarDec(Node):
+    __slots__ = ('kind', 'type', 'names')
+
+    def __init__(self, position, kind, type, names):
+        super().__init__(position)
+        self.kind = kind  # 'field', 'static', 'argument' or 'local'
+        self.type = type
+        self.names = names
+
+
+class SubroutineDec(Node):
+    __slots__ = ('kind', 'returnType', 'name', 'parameters', 'varDecs', 'statements')
+
+    def __init__(self, position, kind, returnType, name, parameters, varDecs, statements):
+        super().__init__(position)
+        self.kind = kind  # 'constructor', 'function' or 'method'
+        self.returnType = returnType
+        self.name = name
+        self.parameters = parameters  # [VarDec] of kind 'argument', one name each
+        self.varDecs = varDecs  # [VarDec] of kind 'local'
+        self.statements = statements
+
+
+# statements
+
+class LetStatement(Node):
+    __slots__ = ('name', 'index', 'value')
+
+    def __init__(self, position, name, index, value):
+        super().__init__(position)
+        self.name = name
+        self.index = index  # Expression, or None if not an array entry
+        self.value = value
+
+
+class IfStatement(Node):
+    __slots__ = ('condition', 'statements', 'elseStatements')
+
+    def __init__(self, position, condition, statements, elseStatements):
+        super().__init__(position)
+        self.condition = condition
+        self.statements = statements
+        self.elseStatements = elseStatements  # None if there is no else clause
+
+
+class WhileStatement(Node):
+    __slots__ = ('condition', 'statements')
+
+    def __init__(self, position, condition, statements):
+        super().__init__(position)
+        self.condition = condition
+        self.statements = statements
+
+
+class DoStatement(Node):
+    __slots__ = ('call',)
+
+    def __init__(self, position, call):
+        super().__init__(position)
+        self.call = call
+
+
+class ReturnStatement(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, position, value):
+        super().__init__(position)
+        self.value = value  # None for 'return;'
+
+
+# expressions
+
+class Expression(Node):
+    __slots__ = ('term', 'operations')
+
+    def __init__(self, position, term, operations):
+        super().__init__(position)
+        self.term = term
+        self.operations = operations  # [(op, term)], applied from left to right
+
+    def children(self):
+        yield self.term
+        for _, term in self.operations:
+            yield term
+
+
+class IntegerConstant(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, position, value):
+        super().__init__(position)
+        self.value = value
+
+
+class StringConstant(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, position, value):
+        super().__init__(position)
+        self.value = value
+
+
+class KeywordConstant(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, position, value):
+        super().__init__(position)
+        self.value = value  # 'true', 'false', 'null' or 'this'
+
+
+class VarRef(Node):
+    __slots__ = ('name',)
+
+    def __init__(self, position, name):
+        super().__init__(position)
+        self.name = name
+
+
+class ArrayRef(Node):
+    __slots__ = ('name', 'index')
+
+    def __init__(self, position, name, index):
+        super().__init__(position)
+        self.name = name
+        self.index = index
+
+
+class SubroutineCall(Node):
+    __slots__ = ('receiver', 'name', 'arguments')
+
+    def __init__(self, position, receiver, name, arguments):
+        super().__init__(position)
+        self.receiver = receiver  # className or varName before the '.', None for a method of this class
+        self.name = name
+        self.arguments = arguments
+
+
+class UnaryOp(Node):
+    __slots__ = ('op', 'term')
+
+    def __init__(self, position, op, term):
+        super().__init__(position)
+        self.op = op
+        self.term = term
+
+
+def main():
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
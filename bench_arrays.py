@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+from sys import exit
+from sys import argv
+from CompilationEngine import CompilationEngine
+import os
+import shutil
+import tempfile
+
+"""
+* Measures the code generated for a program:
+    * compiles every .jack file of the given directory (samples/Arrays by default)
+        into a temporary directory,
+    * runs Main.main on a small VM emulator, and
+    * prints the number of VM commands generated, the number of VM commands
+        executed, and what the program printed.
+
+* To compare with another version of the compiler, check it out and run
+    the same script; the output printed by the program must not change.
+
+* The emulator implements the VM commands, and only the OS subroutines the
+    samples use: Array.new, Memory.alloc, Memory.deAlloc, String.new,
+    String.appendChar, Math.multiply, Math.divide, Output.printInt,
+    Output.printString, Output.println.
+    Labels are not counted as executed commands.
+"""
+
+SEGMENTS = {'local': 1, 'argument': 2, 'this': 3, 'that': 4}
+STACK_BASE = 256
+HEAP_BASE = 2048
+STATIC_BASE = 16
+
+
+def s16(value):
+    """ Returns the given value as a signed 16-bit integer. """
+    value = value & 0xffff
+    return value - 0x10000 if value & 0x8000 else value
+
+
+class VMEmulator:
+    def __init__(self, vm_filenames):
+        """ Loads the given .vm files; each file gets its own static segment. """
+        self.code = []  # [(function name, static base, command words)]
+        self.labels = dict()  # (function name, label) -> address
+        self.functions = dict()  # function name -> address
+        staticBase = STATIC_BASE
+        for filename in vm_filenames:
+            statics = 0
+            function = None
+            with open(filename) as inFileHandle:
+                for line in inFileHandle:
+                    words = line.split()
+                    if not words:
+                        continue
+                    if words[0] == 'function':
+                        function = words[1]
+                        self.functions[function] = len(self.code)
+                    elif words[0] == 'label':
+                        self.labels[(function, words[1])] = len(self.code)
+                    elif len(words) == 3 and words[1] == 'static':
+                        statics = max(statics, int(words[2]) + 1)
+                    self.code.append((function, staticBase, words))
+            staticBase = staticBase + statics
+
+        self.ram = [0] * 32768
+        self.heap = HEAP_BASE
+        self.output = []
+
+    def address(self, segment, index, staticBase):
+        if segment in SEGMENTS:
+            return self.ram[SEGMENTS[segment]] + index
+        if segment == 'pointer':
+            return 3 + index
+        if segment == 'temp':
+            return 5 + index
+        if segment == 'static':
+            return staticBase + index
+        assert False, f'unknown segment "{segment}"'
+
+    def push(self, value):
+        self.ram[self.ram[0]] = value & 0xffff
+        self.ram[0] = self.ram[0] + 1
+
+    def pop(self):
+        self.ram[0] = self.ram[0] - 1
+        return self.ram[self.ram[0]]
+
+    def callOS(self, name, args):
+        """ Runs the given OS subroutine, and returns its result. """
+        if name in ('Array.new', 'Memory.alloc'):
+            block = self.heap
+            self.heap = self.heap + max(args[0], 1)
+            return block
+        if name == 'Memory.deAlloc':
+            return 0
+        if name == 'String.new':  # the length is kept in the first word, the characters follow
+            block = self.heap
+            self.heap = self.heap + args[0] + 1
+            self.ram[block] = 0
+            return block
+        if name == 'String.appendChar':
+            self.ram[args[0]] = self.ram[args[0]] + 1
+            self.ram[args[0] + self.ram[args[0]]] = args[1]
+            return args[0]
+        if name == 'Math.multiply':
+            return s16(args[0]) * s16(args[1])
+        if name == 'Math.divide':
+            return int(s16(args[0]) / s16(args[1]))
+        if name == 'Output.printInt':
+            self.output.append(str(s16(args[0])))
+            return 0
+        if name == 'Output.printString':
+            self.output.append(''.join(chr(self.ram[args[0] + 1 + i]) for i in range(self.ram[args[0]])))
+            return 0
+        if name == 'Output.println':
+            self.output.append('\n')
+            return 0
+        assert False, f'the emulator does not implement "{name}"'
+
+    def run(self, entry='Main.main'):
+        """ Calls the given function, with no arguments, and runs until it returns.
+            Returns the number of VM commands executed. """
+        ram = self.ram
+        ram[0] = STACK_BASE
+        for _ in range(5):  # the frame of the caller
+            self.push(0)
+        ram[1] = ram[0]
+        ram[2] = ram[0] - 5
+        pc = self.functions[entry]
+        depth = 1
+        count = 0
+
+        while depth > 0:
+            function, staticBase, words = self.code[pc]
+            pc = pc + 1
+            command = words[0]
+            if command == 'label':
+                continue
+            count = count + 1
+            if command == 'push':
+                if words[1] == 'constant':
+                    self.push(int(words[2]))
+                else:
+                    self.push(ram[self.address(words[1], int(words[2]), staticBase)])
+            elif command == 'pop':
+                value = self.pop()
+                ram[self.address(words[1], int(words[2]), staticBase)] = value
+            elif command in ('add', 'sub', 'and', 'or', 'eq', 'gt', 'lt'):
+                b = s16(self.pop())
+                a = s16(self.pop())
+                self.push({'add': lambda: a + b, 'sub': lambda: a - b, 'and': lambda: a & b,
+                           'or': lambda: a | b, 'eq': lambda: -(a == b), 'gt': lambda: -(a > b),
+                           'lt': lambda: -(a < b)}[command]())
+            elif command == 'neg':
+                self.push(-s16(self.pop()))
+            elif command == 'not':
+                self.push(~self.pop())
+            elif command == 'goto':
+                pc = self.labels[(function, words[1])]
+            elif command == 'if-goto':
+                if self.pop() != 0:
+                    pc = self.labels[(function, words[1])]
+            elif command == 'function':
+                for _ in range(int(words[2])):
+                    self.push(0)
+            elif command == 'call':
+                name, n_args = words[1], int(words[2])
+                if name not in self.functions:
+                    args = ram[ram[0] - n_args:ram[0]]
+                    ram[0] = ram[0] - n_args
+                    self.push(self.callOS(name, args))
+                    continue
+                self.push(pc)
+                for register in (1, 2, 3, 4):  # LCL, ARG, THIS, THAT
+                    self.push(ram[register])
+                ram[2] = ram[0] - n_args - 5
+                ram[1] = ram[0]
+                pc = self.functions[name]
+                depth = depth + 1
+            elif command == 'return':
+                frame = ram[1]
+                returnAddress = ram[frame - 5]
+                ram[ram[2]] = self.pop()
+                ram[0] = ram[2] + 1
+                ram[4], ram[3], ram[2], ram[1] = ram[frame - 1], ram[frame - 2], ram[frame - 3], ram[frame - 4]
+                pc = returnAddress
+                depth = depth - 1
+            else:
+                assert False, f'unknown command "{command}"'
+        return count
+
+
+def main():
+    if len(argv) > 2:
+        print("Usage: ./bench_arrays.py [directory_name]")
+        return 1
+    directory = argv[1] if len(argv) == 2 else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            "samples", "Arrays")
+    with tempfile.TemporaryDirectory() as workDirectory:
+        vm_filenames = []
+        for file in sorted(os.listdir(directory)):
+            if file.endswith(".jack"):
+                source = shutil.copy(os.path.join(directory, file), workDirectory)
+                CompilationEngine(source, source.replace(".jack", ".vm"))
+                vm_filenames.append(source.replace(".jack", ".vm"))
+
+        emulator = VMEmulator(vm_filenames)
+        executed = emulator.run()
+
+    generated = sum(1 for _, _, words in emulator.code if words[0] not in ('label', 'function'))
+    print(f"VM commands generated: {generated}")
+    print(f"VM commands executed:  {executed}")
+    print(f"output: {' '.join(emulator.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
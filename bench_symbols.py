@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+from sys import exit
+from sys import argv
+from SymbolTable import ST, Kind
+import timeit
+
+"""
+* Measures how fast variables are resolved, on an identifier-heavy scope:
+    N_CLASS_VARIABLES fields and statics, and N_SUBROUTINE_VARIABLES arguments
+    and locals, every one of them looked up in turn.
+    * chained: a single ST.resolve on the subroutine-level table, which holds
+        the class-level entries too.
+    * two tables: the way the compiler used to look variables up; 'in' on the
+        subroutine-level table, 'in' on the class-level table, then 'get'.
+* Also measures resetting a subroutine-level table against building a new one.
+* Results are the best of REPEAT runs of NUMBER rounds each.
+"""
+
+N_CLASS_VARIABLES = 20
+N_SUBROUTINE_VARIABLES = 20
+NUMBER = 20000
+REPEAT = 5
+
+
+def fill(symbolTable, names, kinds):
+    for i, name in enumerate(names):
+        symbolTable.add(name, 'int', kinds[i % len(kinds)])
+
+
+def best(function, number):
+    """ Returns the shortest time, in seconds, of number calls of the given function. """
+    return min(timeit.repeat(function, number=number, repeat=REPEAT))
+
+
+def main():
+    if len(argv) != 1:
+        print("Usage: ./bench_symbols.py")
+        return 1
+    classNames = [f"classVar{i}" for i in range(N_CLASS_VARIABLES)]
+    subroutineNames = [f"var{i}" for i in range(N_SUBROUTINE_VARIABLES)]
+    names = classNames + subroutineNames
+
+    classST = ST()
+    fill(classST, classNames, (Kind.FIELD, Kind.STATIC))
+    subroutineST = ST(classST)
+    fill(subroutineST, subroutineNames, (Kind.ARGUMENT, Kind.LOCAL))
+    separateST = ST()  # no parent: the class-level variables are only in classST
+    fill(separateST, subroutineNames, (Kind.ARGUMENT, Kind.LOCAL))
+
+    def chained():
+        resolve = subroutineST.resolve
+        for name in names:
+            resolve(name)
+
+    def twoTables():
+        for name in names:
+            if name in separateST or name in classST:
+                separateST.get(name) if name in separateST else classST.get(name)
+
+    def reset():
+        subroutineST.reset()
+        fill(subroutineST, subroutineNames, (Kind.ARGUMENT, Kind.LOCAL))
+
+    def rebuild():
+        fill(ST(classST), subroutineNames, (Kind.ARGUMENT, Kind.LOCAL))
+
+    for title, function in (("chained", chained), ("two tables", twoTables)):
+        seconds = best(function, NUMBER)
+        print(f"{title:<12} {len(names) * NUMBER / seconds / 1e6:6.2f} M lookups/s")
+    for title, function in (("reset", reset), ("rebuild", rebuild)):
+        seconds = best(function, NUMBER // 10)
+        print(f"{title:<12} {seconds / (NUMBER // 10) * 1e6:6.2f} us per subroutine table")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
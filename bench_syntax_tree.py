@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+from sys import exit
+from sys import argv
+from JackTokenizer import tokenize
+import JackParser
+import glob
+import os
+import tempfile
+import time
+import tracemalloc
+
+"""
+* Measures the syntax trees built by the JackParser, for every given .jack file
+    (every .jack file under samples/ by default):
+    * the memory a tree takes, in KB per 1k tokens, as traced by tracemalloc
+        once the tokenizer is released, after a first parse of the file,
+    * the time it takes to tokenize and parse the file, and
+    * the time it takes to load the tree from the cache instead
+        (JackParser.parse with useCache, in a temporary cache directory).
+* Times are the best of REPEAT runs.
+"""
+
+REPEAT = 20
+
+
+def bestTime(function):
+    """ Returns the shortest time, in seconds, of REPEAT calls of the given function. """
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def treeMemory(filename):
+    """ Returns the number of bytes allocated for the tree of the given file. """
+    JackParser.JackParser(filename)  # leaves out what is allocated only once, like the compiled regex
+    tracemalloc.start()
+    parser = JackParser.JackParser(filename)
+    parser.tokenizer = None  # only the tree is kept
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    files = argv[1:] or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      "samples", "**", "*.jack"), recursive=True))
+    if not files:
+        print("Usage: ./bench_syntax_tree.py [.jack file]...")
+        return 1
+
+    with tempfile.TemporaryDirectory() as cacheDirectory:
+        JackParser.CACHE_DIR = cacheDirectory
+        print(f"{'file':<40} {'tokens':>7} {'KB/1k tokens':>13} {'parse ms':>9} {'cache ms':>9}")
+        for filename in files:
+            n_tokens = sum(1 for _ in tokenize(filename))
+            size = treeMemory(filename)
+            parseTime = bestTime(lambda: JackParser.parse(filename))
+            JackParser.parse(filename, useCache=True)  # fills the cache
+            loadTime = bestTime(lambda: JackParser.parse(filename, useCache=True))
+            print(f"{os.path.relpath(filename):<40} {n_tokens:>7} {size / n_tokens:>13.1f} "
+                  f"{parseTime * 1000:>9.3f} {loadTime * 1000:>9.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())